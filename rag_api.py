@@ -1,14 +1,26 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-from typing import List, Dict, Any
-import json
-from datetime import datetime, date, timedelta
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel, ValidationError
+from typing import List, Dict, Any, Callable
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from functools import lru_cache
+import anyio
+import anyio.to_thread
+import hashlib
+import logging
+import time
+from datetime import timedelta
 from decimal import Decimal
 import google.generativeai as genai
 from dotenv import load_dotenv
 import os
-import mysql.connector
+import mysql.connector.pooling
+from mysql.connector.constants import FieldType
+import orjson
+
+logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv()
@@ -19,37 +31,134 @@ MYSQL_HOST = os.getenv("MYSQL_HOST")
 MYSQL_USER = os.getenv("MYSQL_USER")
 MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD")
 MYSQL_DATABASE = os.getenv("MYSQL_DATABASE")
+MYSQL_POOL_SIZE = int(os.getenv("MYSQL_POOL_SIZE", "16"))
+MAX_PLACES = int(os.getenv("MAX_PLACES", "80"))
+ITINERARY_CACHE_SIZE = int(os.getenv("ITINERARY_CACHE_SIZE", "512"))
+ITINERARY_CACHE_TTL = int(os.getenv("ITINERARY_CACHE_TTL", "3600"))
 
 if not GEMINI_API_KEY:
     raise ValueError("GEMINI_API_KEY not found in .env")
 if not (MYSQL_HOST and MYSQL_USER and MYSQL_PASSWORD and MYSQL_DATABASE):
     raise ValueError("MySQL credentials not fully found in .env")
+if not 0 < MYSQL_POOL_SIZE <= mysql.connector.pooling.CNX_POOL_MAXSIZE:
+    raise ValueError(
+        f"MYSQL_POOL_SIZE must be between 1 and {mysql.connector.pooling.CNX_POOL_MAXSIZE}"
+    )
 
-# Connect to MySQL database
-def get_db_connection():
-    return mysql.connector.connect(
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Built once per worker process and shared by every request; pooled
+    # connections go back to the pool when closed
+    app.state.db_pool = mysql.connector.pooling.MySQLConnectionPool(
+        pool_name="rag",
+        pool_size=MYSQL_POOL_SIZE,
         host=MYSQL_HOST,
         user=MYSQL_USER,
         password=MYSQL_PASSWORD,
         database=MYSQL_DATABASE,
-        port=3306
+        port=3306,
+        autocommit=True,
+        # Keep server-side prepared statements alive across checkouts; nothing
+        # here changes session state that a reset would need to clear
+        pool_reset_session=False
     )
+    # get_connection() fails instead of waiting when the pool is empty, so never
+    # run more DB calls at once than there are pooled connections
+    app.state.db_limiter = anyio.CapacityLimiter(MYSQL_POOL_SIZE)
+    app.state.planner = GeminiTripPlanner(
+        api_key=GEMINI_API_KEY,
+        cache_size=ITINERARY_CACHE_SIZE,
+        cache_ttl=ITINERARY_CACHE_TTL
+    )
+    yield
+    # On shutdown/reload, release the prepared statements and close the idle pooled
+    # connections. MySQLConnectionPool has no public close, and requests have all
+    # finished by now, so every connection is back in its queue
+    db_pool = app.state.db_pool
+    for cnx in list(db_pool._cnx_queue.queue):
+        close_prepared_cursors(cnx)
+    db_pool._remove_connections()
 
 app = FastAPI(
     title="Gemini Trip Planner API",
     description="API for generating travel itineraries using Google's Gemini AI",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
-class CustomJSONEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return float(obj)
-        elif isinstance(obj, (datetime, date)):
-            return obj.isoformat()
-        elif isinstance(obj, timedelta):
-            return str(obj)
-        return super().default(obj)
+def _json_default(obj):
+    """orjson fallback for DB types it can't serialize natively (datetime/date are native)."""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, timedelta):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+# Static instructions, set once on the model as its system instruction rather
+# than being repeated in every prompt
+SYSTEM_INSTRUCTION = """You are a professional travel planner specializing in generating machine-readable JSON itineraries.
+
+IMPORTANT INSTRUCTIONS:
+1. Please adjust the number of activities and free time based on the selected pace:
+- For fast-paced trips: include more activities with minimal but realistic breaks for transportation and rest. The number of places to visit must be at least 7.
+- For moderate pace: balance activities and free time reasonably. The number of places to visit must be at least 5.
+- For slow-paced: fewer activities with more room for rest and exploration. The number of places to visit must be at least 3.
+2. Always consider reasonable transportation time between places, especially for fast-paced itineraries, to avoid unrealistic schedules.
+3. Do not return the same place more than once.
+4. If possible, return at least one place for each user preference.
+5. Follow this exact structure:
+
+{
+  "trip_name": "string",
+  "destination": "string",
+  "duration_days": number,
+  "trip_style": "string",
+  "pace": "string",
+  "traveler_preferences": ["string"],
+  "itinerary": [
+    {
+      "day": number,
+      "activities": [
+        {
+          "id": int (should be the id of the place coming from places array sent to in the prompt),
+          "time": "string (e.g., 09:00-11:00)",
+          "time_window": "string (morning/afternoon/evening)",
+          "place": "string",
+          "description": "string",
+          "duration": "string",
+          "notes": "string (optional)",
+          "place_label": "string (should be the place_label of the place coming from places array sent to in the prompt)",
+          "parent_label": "string (should be the parent_label of the place coming from places array sent to in the prompt)",
+          "latitude": decimal number (should be the latitude of the place coming from places array sent to in the prompt),
+          "longitude": decimal number (should be the longitude of the place coming from places array sent to in the prompt),
+          "image_url": string (should be one of the image_urls of the place coming from places array sent to in the prompt),
+        }
+      ]
+    }
+  ],
+  "estimated_costs": {
+    "currency": "string",
+    "accommodation": "string",
+    "meals": "string",
+    "transportation": "string",
+    "activities": "string",
+    "total_estimate": "string"
+  },
+  "travel_tips": ["string"]
+}
+
+Example of valid time formats:
+- "09:00-11:00"
+- "14:30-16:00"
+- "19:00-22:00"
+
+Example of duration formats:
+- "2 hours"
+- "30 minutes"
+- "Full day"
+"""
+PLACES_SECTION_HEADER = b"\n\nAvailable Places (use these JSON objects directly in the itinerary `place` field):\n"
 
 class TripRequest(BaseModel):
     destination: str
@@ -58,13 +167,29 @@ class TripRequest(BaseModel):
     trip_style: str = "luxury"
     pace: str = "moderate"
 
+async def parse_trip_request(request: Request) -> TripRequest:
+    """Validate the body straight from JSON bytes, skipping FastAPI's json.loads + dict validation."""
+    try:
+        return TripRequest.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+        )
+
 class GeminiTripPlanner:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cache_size: int = 512, cache_ttl: int = 3600):
         genai.configure(api_key=api_key)
         self.api_key = api_key
-        self.model = genai.GenerativeModel("gemini-2.0-flash-lite")
+        self.model = genai.GenerativeModel(
+            "gemini-2.0-flash-lite",
+            system_instruction=SYSTEM_INSTRUCTION
+        )
+        # LRU of prompt digest -> (expires_at, itinerary)
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._cache_ttl = cache_ttl
 
-    def generate_trip_plan(
+    async def generate_trip_plan(
         self,
         destination: str,
         duration_days: int,
@@ -83,26 +208,32 @@ class GeminiTripPlanner:
             db_places=db_places
         )
 
+        # The prompt encodes every input (including the places), so identical
+        # prompts can reuse a previous itinerary instead of calling Gemini again
+        cache_key = hashlib.blake2b(prompt.encode(), digest_size=16).digest()
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
-            response = self.model.generate_content(
+            response = await self.model.generate_content_async(
                 prompt,
                 generation_config={
                     "temperature": 0.5,
                     "top_p": 0.9,
                     "max_output_tokens": 8192,
+                    # JSON mode: the model returns a bare JSON document, no markdown fences
+                    "response_mime_type": "application/json",
                 }
             )
-            response_text = response.text
-
-            if response_text.startswith('```json'):
-                response_text = response_text[7:-3]
-            elif response_text.startswith('```'):
-                response_text = response_text[3:-3]
-
-            parsed = json.loads(response_text.strip())
+            # JSON mode shouldn't emit markdown fences, but drop them if it does; these
+            # only inspect the ends and return the same string when nothing matches
+            response_text = response.text.strip().removeprefix("```json").removeprefix("```").removesuffix("```")
+            parsed = orjson.loads(response_text)
+            self._cache_put(cache_key, parsed)
             return parsed
 
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             raise HTTPException(
                 status_code=500,
                 detail=f"Failed to parse JSON response from Gemini: {str(e)}"
@@ -113,6 +244,25 @@ class GeminiTripPlanner:
                 detail=f"Failed to generate trip plan: {str(e)}"
             )
 
+    def _cache_get(self, key: bytes):
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, itinerary = entry
+        if expires_at < time.monotonic():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return itinerary
+
+    def _cache_put(self, key: bytes, itinerary: Dict[str, Any]):
+        if self._cache_size <= 0:
+            return
+        self._cache[key] = (time.monotonic() + self._cache_ttl, itinerary)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
     def _create_prompt(
         self,
         destination: str,
@@ -122,151 +272,173 @@ class GeminiTripPlanner:
         pace: str,
         db_places: List[Dict[str, Any]] = None
     ) -> str:
-        places_section = ""
+        head = f"""Create a detailed {duration_days}-day {trip_style} trip itinerary for {destination} with a {pace} pace.
+Traveler preferences: {', '.join(traveler_preferences)}."""
+        # Splice the serialized places in as bytes and decode the whole prompt once
+        parts = [head.encode()]
         if db_places:
-            places_json = json.dumps(db_places, indent=2, ensure_ascii=False, cls=CustomJSONEncoder)
-            places_section = f"\n\nAvailable Places (use these JSON objects directly in the itinerary `place` field):\n{places_json}\n"
-        return f"""You are a professional travel planner specializing in generating machine-readable JSON itineraries.
+            parts += [
+                PLACES_SECTION_HEADER,
+                orjson.dumps(db_places, default=_json_default),
+                b"\n"
+            ]
+        return b"".join(parts).decode()
 
-Create a detailed {duration_days}-day {trip_style} trip itinerary for {destination} with a {pace} pace.
-Traveler preferences: {', '.join(traveler_preferences)}.{places_section}
+def get_db_pool(request: Request) -> mysql.connector.pooling.MySQLConnectionPool:
+    return request.app.state.db_pool
 
-IMPORTANT INSTRUCTIONS:
-1. Format your response as a perfect JSON object
-2. Do not include any text outside the JSON object
-3. Escape all special characters
-4. Please adjust the number of activities and free time based on the selected pace:
-- For fast-paced trips: include more activities with minimal but realistic breaks for transportation and rest. The number of places to visit must be at least 7.
-- For moderate pace: balance activities and free time reasonably. The number of places to visit must be at least 5.
-- For slow-paced: fewer activities with more room for rest and exploration. The number of places to visit must be at least 3.
-5. Always consider reasonable transportation time between places, especially for fast-paced itineraries, to avoid unrealistic schedules.
-6. Do not return the same place more than once.
-7. If possible, return at least one place for each user preference.
-8. Follow this exact structure:
+def get_db_limiter(request: Request) -> anyio.CapacityLimiter:
+    return request.app.state.db_limiter
 
-{{
-  "trip_name": "string",
-  "destination": "string",
-  "duration_days": number,
-  "trip_style": "string",
-  "pace": "string",
-  "traveler_preferences": ["string"],
-  "itinerary": [
-    {{
-      "day": number,
-      "activities": [
-        {{
-          "id": int (should be the id of the place coming from places array sent to in the prompt),
-          "time": "string (e.g., 09:00-11:00)",
-          "time_window": "string (morning/afternoon/evening)",
-          "place": "string",
-          "description": "string",
-          "duration": "string",
-          "notes": "string (optional)",
-          "place_label": "string (should be the place_label of the place coming from places array sent to in the prompt)",
-          "parent_label": "string (should be the parent_label of the place coming from places array sent to in the prompt)",
-          "latitude": decimal number (should be the latitude of the place coming from places array sent to in the prompt),
-          "longitude": decimal number (should be the longitude of the place coming from places array sent to in the prompt),
-          "image_url": string (should be the image_url of the place coming from places array sent to in the prompt),
-        }}
-      ]
-    }}
-  ],
-  "estimated_costs": {{
-    "currency": "string",
-    "accommodation": "string",
-    "meals": "string",
-    "transportation": "string",
-    "activities": "string",
-    "total_estimate": "string"
-  }},
-  "travel_tips": ["string"]
-}}
+def get_planner(request: Request) -> GeminiTripPlanner:
+    return request.app.state.planner
 
-Example of valid time formats:
-- "09:00-11:00"
-- "14:30-16:00"
-- "19:00-22:00"
-
-Example of duration formats:
-- "2 hours"
-- "30 minutes"
-- "Full day"
-DO NOT include any additional text or explanations outside the JSON object."""
-
-# Initialize planner instance
-planner = GeminiTripPlanner(api_key=GEMINI_API_KEY)
+ROOT_RESPONSE_BODY = orjson.dumps({"message": "Welcome to the Gemini Trip Planner API"})
 
 @app.get("/")
 def read_root():
-    return {"message": "Welcome to the Gemini Trip Planner API"}
-
-def serialize_row(row: Dict[str, Any]) -> Dict[str, Any]:
-    """Convert non-serializable DB row values to JSON-serializable formats."""
-    return {
-        k: (
-            v.isoformat() if isinstance(v, (datetime, date)) else
-            float(v) if isinstance(v, Decimal) else
-            str(v) if isinstance(v, timedelta) else
-            v
+    return Response(content=ROOT_RESPONSE_BODY, media_type="application/json")
+
+# Shared projection for the places queries, one row per place; l2 is the parent label of l.
+# Each place keeps one (label, parent label) pair taken from the same label row, and
+# images are collapsed into a JSON array per place instead of multiplying rows.
+PLACES_SELECT = """
+    SELECT ranked.id, ranked.name, ranked.longitude, ranked.latitude, ranked.open_hours,
+    ranked.rating, ranked.price_range, ranked.place_label, ranked.parent_label,
+    CAST(COALESCE(
+        (SELECT JSON_ARRAYAGG(pli.img_url) FROM places_images pli WHERE pli.place_id = ranked.id),
+        JSON_ARRAY()
+    ) AS JSON) AS image_urls
+    FROM (
+        SELECT p.id, p.name, p.longitude, p.latitude, p.open_hours, p.rating, p.price_range,
+        l.label_name AS place_label, l2.label_name AS parent_label,
+        ROW_NUMBER() OVER (PARTITION BY p.id ORDER BY l.label_name, l2.label_name) AS label_rank
+        FROM places p
+        JOIN places_labels pl ON p.id = pl.place_id
+        JOIN labels l ON pl.label_id = l.id
+        JOIN labels l2 ON l.parent_id = l2.id
+        WHERE p.city = %s
+"""
+# Best rated places first, capped so the result set and the prompt stay bounded
+PLACES_PICK_AND_LIMIT = """
+    ) ranked
+    WHERE ranked.label_rank = 1
+    ORDER BY ranked.rating DESC
+    LIMIT %s
+"""
+
+# Fixed-shape statements so they can be prepared once per connection. Preferences
+# are bound as one comma-separated string; parent matches go through the l2 join.
+PLACES_BY_LABEL_QUERY = PLACES_SELECT + """
+        AND (
+            FIND_IN_SET(l.label_name, %s)  -- Direct matches
+            OR FIND_IN_SET(l2.label_name, %s)  -- Parent matches
         )
-        for k, v in row.items()
-    }
+""" + PLACES_PICK_AND_LIMIT
+PLACES_QUERY = PLACES_SELECT + PLACES_PICK_AND_LIMIT
+
+def _close_cursors(cursors: Dict[str, Any]):
+    for cursor in cursors.values():
+        try:
+            cursor.close()
+        except Exception:
+            # The session may already be gone; the server dropped its statements with it
+            pass
+    cursors.clear()
+
+def _prepared_cursors(cnx) -> Dict[str, Any]:
+    """Prepared cursors by statement, cached on the connection object they are bound to.
 
-@app.post("/generate-itinerary", response_model=Dict[str, Any])
-async def generate_itinerary(request: TripRequest):
+    They live as long as that connection, and are discarded when it reconnects,
+    since the new server session has none of the old statements.
+    """
+    cached = getattr(cnx, "_rag_prepared_cursors", None)
+    if cached is None or cached[0] != cnx.connection_id:
+        if cached is not None:
+            _close_cursors(cached[1])
+        cached = (cnx.connection_id, {})
+        cnx._rag_prepared_cursors = cached
+    return cached[1]
+
+def close_prepared_cursors(cnx):
+    cached = getattr(cnx, "_rag_prepared_cursors", None)
+    if cached is not None:
+        _close_cursors(cached[1])
+
+def _execute_prepared(conn, statement: str, params: tuple):
+    """Execute on a cached prepared cursor so the statement is parsed and planned only once."""
+    # The pool wrapper has no public accessor for the connection it hands out;
+    # a pooled connection is used by one thread at a time, so its cursors are too
+    cursors = _prepared_cursors(conn._cnx)
+    cursor = cursors.get(statement)
+    if cursor is None:
+        cursor = cursors[statement] = conn.cursor(prepared=True)
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        placeholders = ', '.join(['%s'] * len(request.traveler_preferences))
-        query = f"""
-            SELECT DISTINCT p.id, p.name, p.longitude, p.latitude, p.city, p.country, p.country_id, p.open_hours, p.rating, 
-            p.number_of_ratings, p.created_at, p.updated_at, p.website, p.phone, p.price_range, pl.place_id, pl.label_id,
-            l.label_name as place_label, l.parent_id, l2.label_name as parent_label, pli.img_url as image_url
-            FROM places p
-            JOIN places_labels pl ON p.id = pl.place_id
-            JOIN places_images pli on p.id = pli.place_id 
-            JOIN labels l ON pl.label_id = l.id
-            JOIN labels l2 ON l.parent_id = l2.id
-            WHERE p.city = %s
-            AND (
-                l.label_name IN ({placeholders})  -- Direct matches
-                OR 
-                l.parent_id IN (
-                    SELECT l.id
-                    FROM labels l 
-                    WHERE l.label_name IN ({placeholders})  -- Parent matches
-                )
-                )
-                """
-        params = [request.destination] + request.traveler_preferences + request.traveler_preferences
-        cursor.execute(query, params)
-
-        columns = [col[0] for col in cursor.description]
-        rows = cursor.fetchall()
-        places = [serialize_row(dict(zip(columns, row))) for row in rows]
+        cursor.execute(statement, params)
+    except Exception:
+        # Don't keep a cursor whose connection or statement may be gone
+        cursors.pop(statement, None)
+        _close_cursors({statement: cursor})
+        raise
+    return cursor
+
+# Per column type conversion of driver values for the prompt; other types are
+# kept as returned (orjson serializes datetime/date natively)
+_FIELD_TYPE_CONVERTERS = {
+    FieldType.DECIMAL: float,
+    FieldType.NEWDECIMAL: float,
+    FieldType.TIME: str,
+    # JSON columns (image_urls) are embedded verbatim instead of being parsed
+    FieldType.JSON: orjson.Fragment,
+}
+
+@lru_cache(maxsize=8)
+def _row_builder(description: tuple) -> Callable[[tuple], Dict[str, Any]]:
+    """Return a row -> place dict function for one result shape.
+
+    Converters are resolved from the column types once, so building a row
+    only touches the columns that actually need converting.
+    """
+    columns = [column[0] for column in description]
+    converters = [
+        (index, _FIELD_TYPE_CONVERTERS[column[1]])
+        for index, column in enumerate(description)
+        if column[1] in _FIELD_TYPE_CONVERTERS
+    ]
+
+    def build(row: tuple) -> Dict[str, Any]:
+        values = list(row)
+        for index, convert in converters:
+            if values[index] is not None:
+                values[index] = convert(values[index])
+        return dict(zip(columns, values))
+
+    return build
+
+def fetch_places(
+    db_pool: mysql.connector.pooling.MySQLConnectionPool,
+    destination: str,
+    traveler_preferences: List[str],
+    min_places: int
+) -> List[Dict[str, Any]]:
+    """Fetch candidate places for the destination. Blocking; call it from a worker thread."""
+    with db_pool.get_connection() as conn:
+        preferences = ",".join(traveler_preferences)
+        cursor = _execute_prepared(
+            conn,
+            PLACES_BY_LABEL_QUERY,
+            (destination, preferences, preferences, MAX_PLACES)
+        )
+        to_place = _row_builder(tuple(cursor.description))
+        places = [to_place(row) for row in cursor.fetchall()]
 
         # If not enough places, run a broader query
-        min_places = 3 * request.duration_days
+        min_places = min(min_places, MAX_PLACES)
         if len(places) < min_places:
             # Example: fetch more places from the same country, regardless of label
-            cursor.execute(
-                """
-                SELECT DISTINCT p.id, p.name, p.longitude, p.latitude, p.city, p.country, p.country_id, p.open_hours, p.rating, 
-                p.number_of_ratings, p.created_at, p.updated_at, p.website, p.phone, p.price_range, pl.place_id, pl.label_id,
-                l.label_name as place_label, l.parent_id, l2.label_name as parent_label, pli.img_url as image_url
-                FROM places p
-                JOIN places_labels pl ON p.id = pl.place_id
-                JOIN places_images pli on p.id = pli.place_id 
-                JOIN labels l ON pl.label_id = l.id
-                JOIN labels l2 ON l.parent_id = l2.id
-                WHERE p.city = %s
-                """,
-                [request.destination]
-            )
-            extra_rows = cursor.fetchall()
-            extra_places = [serialize_row(dict(zip(columns, row))) for row in extra_rows]
+            cursor = _execute_prepared(conn, PLACES_QUERY, (destination, MAX_PLACES))
+            to_place = _row_builder(tuple(cursor.description))
+            extra_places = [to_place(row) for row in cursor.fetchall()]
             # Add only new places (avoid duplicates)
             existing_ids = {p['id'] for p in places}
             for place in extra_places:
@@ -276,12 +448,37 @@ async def generate_itinerary(request: TripRequest):
                 if len(places) >= min_places:
                     break
 
-        cursor.close()
-        conn.close()
+    return places
+
+@app.post(
+    "/generate-itinerary",
+    # The body is parsed by parse_trip_request, so describe it for the docs explicitly
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": TripRequest.model_json_schema()}}
+        }
+    }
+)
+async def generate_itinerary(
+    request: TripRequest = Depends(parse_trip_request),
+    db_pool: mysql.connector.pooling.MySQLConnectionPool = Depends(get_db_pool),
+    db_limiter: anyio.CapacityLimiter = Depends(get_db_limiter),
+    planner: GeminiTripPlanner = Depends(get_planner)
+):
+    try:
+        places = await anyio.to_thread.run_sync(
+            fetch_places,
+            db_pool,
+            request.destination,
+            request.traveler_preferences,
+            3 * request.duration_days,
+            limiter=db_limiter
+        )
 
-        print(places)
-        print("END OF PLACES")
-        itinerary = planner.generate_trip_plan(
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("places=%s", orjson.dumps(places, default=_json_default).decode())
+        itinerary = await planner.generate_trip_plan(
             destination=request.destination,
             duration_days=request.duration_days,
             traveler_preferences=request.traveler_preferences,
@@ -289,9 +486,11 @@ async def generate_itinerary(request: TripRequest):
             pace=request.pace,
             db_places=places
         )
-        print(itinerary)
-        # Return using CustomJSONEncoder in case of datetime or others
-        return JSONResponse(content=json.loads(json.dumps(itinerary, cls=CustomJSONEncoder)))
+        # Serialize once with orjson and send the bytes as-is
+        body = orjson.dumps(itinerary, default=_json_default)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("itinerary=%s", body.decode())
+        return Response(content=body, media_type="application/json")
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))